@@ -1,14 +1,20 @@
 import os
+import re
+import time
 import praw
+import orjson
 import logging
 import argparse
 import requests
-import pandas as pd
-from database import F1Database
+from database import F1Database, PostRow, CommentRow
+from ergast import HTTP_SESSION, HTTP_TIMEOUT, ERGAST_CACHE_TTL, ERGAST_LATEST_TTL
 from datetime import date, timezone, timedelta, datetime
 from dotenv import load_dotenv, find_dotenv
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from collections import deque
 from praw.models import Submission
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 SESSION_CONFIG = {
     "FP1": {
@@ -42,23 +48,69 @@ SESSION_CONFIG = {
         "keywords": ["race", "grand prix", "gp", "race thread", "race discussion", "race results", "race live", "race start", "race finish", "race podium", "race highlights", "race recap", "race analysis", "race review"],
     }
 }
+
+#frozen keyword tuples, built once at import instead of re-read from SESSION_CONFIG per run
+SESSION_KEYWORDS = {session: tuple(config["keywords"]) for session, config in SESSION_CONFIG.items()}
+
+def ReduceKeywords(keywords: tuple) -> tuple:
+    """
+    Drops keywords that contain a shorter keyword (e.g. "fp1 thread" vs "fp1"),
+    any title they'd match is already matched by the shorter one
+    """
+    return tuple(kw for kw in keywords if not any(other != kw and other in kw for other in keywords))
+
+#one compiled alternation per session so each title gets scanned once instead of once per keyword
+SESSION_RE = {
+    session: re.compile("|".join(re.escape(kw) for kw in ReduceKeywords(keywords)))
+    for session, keywords in SESSION_KEYWORDS.items()
+}
+
+#session -> its date key in the Ergast race data, shared by session validation & the date window lookup
+SESSION_DATE_KEYS = {
+    "FP1": "FirstPractice",
+    "FP2": "SecondPractice",
+    "FP3": "ThirdPractice",
+    "QUALIFYING": "Qualifying",
+    "SPRINT": "Sprint",
+    "SPRINT QUALIFYING": "SprintQualifying",
+    "RACE": "date"
+}
+#session -> <days before, days after> the session date to search for posts
+SESSION_WINDOWS = {
+    "FP1": (2, 1),
+    "FP2": (2, 1),
+    "FP3": (2, 1),
+    "QUALIFYING": (1, 1),
+    "SPRINT QUALIFYING": (1, 1),
+    "SPRINT": (1, 1),
+    "RACE": (1, 2)
+}
+
+MAX_WORKERS = 8 #concurrent comment tree fetches, reddit requests r network bound
+
 class RedditScraper:
-    def __init__(self, client_id: str, client_secret: str, user_agent: str):
+    def __init__(self, client_id: str, client_secret: str, user_agent: str, max_workers: int = MAX_WORKERS):
         """
-        Initializes reddit scraper w/ authentication
+        Initializes reddit scraper w/ authentication.
+        All worker threads share one pooled session, sized so every concurrent
+        comment fetch keeps its keep-alive connection instead of reconnecting
         """
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=max(10, max_workers)))
         self.reddit = praw.Reddit(
             client_id = client_id,
             client_secret = client_secret,
-            user_agent = user_agent
+            user_agent = user_agent,
+            requestor_kwargs = {"session": session}
         )
-    
-def GetRaceInfo(year: Optional[int] = None, round: Optional[int] = None) -> Dict:
+
+def GetRaceInfo(year: Optional[int] = None, round: Optional[int] = None, refresh: bool = False) -> Dict:
     """
-    Fetch race info from Ergast API.
+    Fetch race info from Ergast API, served from the on disk cache when possible.
     Args:
         year: optionally add which f1 year
         round: optionally add which f1 race 
+        refresh: skip the cache & re-download the race info
     Returns:
         Dictionary containing race information
     """
@@ -66,14 +118,17 @@ def GetRaceInfo(year: Optional[int] = None, round: Optional[int] = None) -> Dict
         year = year or date.today().year
         if round is not None:
             url = f"https://api.jolpi.ca/ergast/f1/{year}/{round}.json"
+            expire_after = ERGAST_CACHE_TTL
         else:
             url = f"https://api.jolpi.ca/ergast/f1/{year}/last.json"
+            expire_after = ERGAST_LATEST_TTL
             
         print(f"DEBUG: Fetching race info from: {url}")
-        resp = requests.get(url)
+        resp = HTTP_SESSION.get(url, timeout=HTTP_TIMEOUT, expire_after=expire_after, force_refresh=refresh)
+        logging.debug("Race info served from cache: %s", getattr(resp, "from_cache", False))
         resp.raise_for_status()
             
-        json_data = resp.json()
+        json_data = orjson.loads(resp.content)
         print(f"DEBUG: API Response keys: {json_data.keys()}")
             
         races = json_data["MRData"]["RaceTable"]["Races"]
@@ -91,11 +146,22 @@ def GetRaceInfo(year: Optional[int] = None, round: Optional[int] = None) -> Dict
     except requests.RequestException as e:
         logging.error(f"Error fetching race info: {e}")
         raise
-    except (KeyError, IndexError) as e:
+    except (KeyError, IndexError, ValueError) as e:
         logging.error(f"Error parsing race data: {e}")
         print(f"DEBUG: Full API response: {resp.text}")
+        #requests-cache keeps any 200, don't let a bad body get served again for the whole ttl
+        HTTP_SESSION.cache.delete(urls=[url])
         raise
 
+_DOTENV_LOADED = False
+
+def EnsureEnv() -> None:
+    """Loads .env once per process, later calls skip the find_dotenv() walk up the tree"""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv(find_dotenv())
+        _DOTENV_LOADED = True
+
 def ValidateEnvVars() -> None:
     """Validates the required env variables"""
     requiredVars = ["CLIENT_ID", "CLIENT_SECRET", "USER_AGENT"]
@@ -104,9 +170,9 @@ def ValidateEnvVars() -> None:
         raise ValueError(f"Missing required environment variables: {missingVars}")
 
 def CreateFileName(round_num: int, race_name: str, session: str, year: int) -> str:
-    """Creates a file name from race name & session"""
+    """Creates a gzipped csv file name from race name & session"""
     safeName = race_name.replace(" ", "_").replace("'", "").lower()
-    return f"f1_{year}_round_{round_num}_{safeName}_{session.lower()}_reddit.csv"
+    return f"f1_{year}_round_{round_num}_{safeName}_{session.lower()}_reddit.csv.gz"
 
 def GetSessionDates(race_data: dict) -> dict:
     """
@@ -117,9 +183,11 @@ def GetSessionDates(race_data: dict) -> dict:
     print(f"DEBUG: Extracting session dates from race data")
     print(f"DEBUG: Top-level keys: {list(race_data.keys())}")
 
-    sessions = ['DATE', 'FIRSTPRACTICE', 'SECONDPRACTICE', 'THIRDPRACTICE', 'SPRINTQUALIFYING', 'SPRINT', 'QUALIFYING'] #date == actual race on sunday
-    for key, val in race_data.items():
-        if key.upper() in sessions:
+    #look the known keys up directly, main & ValidateSessionExists index session_dates by these exact
+    #keys anyway so a case-insensitive scan over every race_data key couldn't find anything more usable
+    for key in SESSION_DATE_KEYS.values(): #date == actual race on sunday
+        val = race_data.get(key)
+        if val is not None:
             if isinstance(val, str): 
                 session_dates[key] = val
                 print(f"DEBUG: Found top-level {key} on {val}")
@@ -130,7 +198,49 @@ def GetSessionDates(race_data: dict) -> dict:
     print(f"DEBUG: Final session dates: {session_dates}")
     return session_dates
 
-def ProcessPost(post: Submission, session: str, comment_limit: int) -> Optional[Dict]:
+def FormatTimestamp(epoch: float) -> str:
+    """Formats a reddit created_utc epoch as an ISO-8601 UTC string"""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(epoch))
+
+def GetAuthorName(item) -> Optional[str]:
+    """
+    Reads the author name from the data PRAW already loaded, so a missing
+    author never falls through to a lazy fetch. Deleted users return None.
+    """
+    author = vars(item).get("author")
+    return getattr(author, "name", None) if author else None
+
+def FetchCommentData(post: Submission, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Fetches a post's comment tree as raw JSON through PRAW's authenticated
+    session, skipping the Comment object built for every node.
+    Returns the comment dicts breadth first like CommentForest.list(), with
+    "more comments" stubs dropped the same way replace_more(limit=0) does,
+    so it's always a single request per post. Reddit is asked for at most
+    limit comments (in its own sort order) instead of PRAW's default 2048,
+    and the walk stops once limit comments are collected
+    """
+    listing = post._reddit.request(
+        method="GET",
+        path=f"comments/{post.id}",
+        params={"limit": limit or post.comment_limit, "sort": post.comment_sort}
+    )
+    queue = deque(listing[1]["data"]["children"])
+    comments = []
+
+    while queue and (limit is None or len(comments) < limit):
+        child = queue.popleft()
+        if child["kind"] != "t1":
+            continue
+
+        comment = child["data"]
+        comments.append(comment)
+        if comment.get("replies"):
+            queue.extend(comment["replies"]["data"]["children"])
+
+    return comments
+
+def ProcessPost(post: Submission, session: str, comment_limit: int) -> Optional[Tuple[PostRow, List[CommentRow]]]:
     """
     Processes a Reddit post and its comments.
     Args:
@@ -139,68 +249,103 @@ def ProcessPost(post: Submission, session: str, comment_limit: int) -> Optional[
         comment_limit: Maximum number of comments to fetch
         
     Returns:
-        Dictionary containing post and comment data
+        <PostRow, its CommentRows>, or None if the post couldn't be processed
     """
     try:
-        post.comments.replace_more(limit=0)
-        comments = post.comments.list()[:comment_limit]
-
-        postData = {
-            "id": post.id,
-            "session": session,
-            "title": post.title,
-            "selftext": post.selftext,
-            "score": post.score,
-            "created": datetime.fromtimestamp(post.created_utc).isoformat(),
-            "permalink": post.permalink,
-            "author": getattr(post.author, "name", None),
-            "num_comments": post.num_comments,
-            "type": "post"
-        }
+        comments = FetchCommentData(post, comment_limit)
+
+        postData = PostRow(
+            id=post.id,
+            session=session,
+            title=post.title,
+            selftext=post.selftext,
+            score=post.score,
+            created=FormatTimestamp(post.created_utc),
+            permalink=post.permalink,
+            author=GetAuthorName(post),
+            num_comments=post.num_comments
+        )
         
         commentData = []
         for comment in comments:
             try:
-                commentData.append({
-                    "id": getattr(comment, 'id', None),
-                    "link_id": getattr(comment, 'link_id', None),
-                    "parent_id": getattr(comment, 'parent_id', None),
-                    "body": getattr(comment, 'body', ''),
-                    "score": getattr(comment, 'score', 0),
-                    "created": datetime.fromtimestamp(getattr(comment, 'created_utc', 0)).isoformat(),
-                    "author": getattr(comment.author, "name", None) if comment.author else None,
-                    "session": session,
-                    "type": "comment"  
-                })
+                author = comment.get('author')
+                commentData.append(CommentRow(
+                    id=comment.get('id'),
+                    link_id=comment.get('link_id'),
+                    parent_id=comment.get('parent_id'),
+                    body=comment.get('body', ''),
+                    score=comment.get('score', 0),
+                    created=FormatTimestamp(comment.get('created_utc', 0)),
+                    author=author if author != "[deleted]" else None,
+                    session=session
+                ))
             except Exception as e:
-                logging.warning(f"Error processing comment {getattr(comment, 'id', 'unknown')}: {e}")
+                logging.warning(f"Error processing comment {comment.get('id', 'unknown')}: {e}")
                 continue 
         
-        return {"posts": postData, "comments": commentData}
+        return postData, commentData
         
     except Exception as e:
         logging.warning(f"Error processing post {post.id}: {e}")
         return None
 
+def SearchPosts(sub, query: str, limit: int) -> List[Submission]:
+    """Runs one subreddit search & pulls every result page so it can run on a worker thread"""
+    return list(sub.search(query, time_filter="all", sort="top", limit=limit))
+
+def FetchNewPosts(reddit: praw.Reddit, subreddit: str, cutoff_epoch: float, limit: int = 1000):
+    """
+    Yields raw post dicts from r/<subreddit>/new, newest first, 100 per page.
+    Stops requesting pages once a page reaches posts older than cutoff_epoch,
+    and skips building a Submission for posts that never get matched
+    """
+    after = None
+    fetched = 0
+
+    while fetched < limit:
+        params = {"limit": min(100, limit - fetched)}
+        if after:
+            params["after"] = after
+
+        listing = reddit.request(method="GET", path=f"r/{subreddit}/new", params=params)
+        children = listing["data"]["children"]
+        if not children:
+            return
+
+        for child in children:
+            yield child["data"]
+
+        fetched += len(children)
+        after = listing["data"]["after"]
+        if not after or children[-1]["data"]["created_utc"] < cutoff_epoch:
+            return
+
+def ProcessPosts(posts: List[Submission], session: str, comment_limit: int, max_workers: int = MAX_WORKERS) -> List[Optional[Tuple[PostRow, List[CommentRow]]]]:
+    """
+    Processes several Reddit posts concurrently, overlapping the comment fetches.
+    Args:
+        posts: Reddit Submission objects
+        session: Session type
+        comment_limit: Maximum number of comments to fetch per post
+        max_workers: Maximum number of posts fetched at once
+
+    Returns:
+        List of ProcessPost results in the same order as posts
+    """
+    if not posts:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(posts))) as executor:
+        return list(executor.map(lambda post: ProcessPost(post, session, comment_limit), posts))
+
 def GetSessionWindow(session_type: str, session_date: datetime) -> tuple:
     """
     Returns <start, end> times for specific session
     """
-    if session_type in ["FP1", "FP2", "FP3"]:
-        start = session_date - timedelta(days=2)
-        end = session_date + timedelta(days=1)
-    elif session_type in ["QUALIFYING", "SPRINT QUALIFYING"]:
-        start = session_date - timedelta(days=1)
-        end = session_date + timedelta(days=1)
-    elif session_type == "SPRINT":
-        start = session_date - timedelta(days=1)
-        end = session_date + timedelta(days=1)
-    elif session_type == "RACE":
-        start = session_date - timedelta(days=1)
-        end = session_date + timedelta(days=2)
-    else:
-        start = session_date - timedelta(days=1)
-        end = session_date + timedelta(days=1)
+    days_before, days_after = SESSION_WINDOWS.get(session_type, (1, 1))
+    start = session_date - timedelta(days=days_before)
+    end = session_date + timedelta(days=days_after)
     
     return start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)
 
@@ -215,31 +360,11 @@ def ValidateSessionExists(session_type: str, session_dates: dict) -> bool:
     Returns:
         True if session exists, False otherwise
     """
-    session_mapping = {
-        "FP1": "FirstPractice",
-        "FP2": "SecondPractice", 
-        "FP3": "ThirdPractice",
-        "QUALIFYING": "Qualifying",
-        "SPRINT": "Sprint",
-        "SPRINT QUALIFYING": "SprintQualifying",
-        "RACE": "date"  
-    }
-    
-    if session_type not in session_mapping:
-        return False
-        
-    session_key = session_mapping[session_type]
-    return session_key in session_dates
-
-def main():
-    load_dotenv(find_dotenv())
-    ValidateEnvVars()
-
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s %(message)s"
-    )
+    session_key = SESSION_DATE_KEYS.get(session_type)
+    return session_key is not None and session_key in session_dates
 
+def BuildArgParser() -> argparse.ArgumentParser:
+    """Builds the command line parser, the batch scraper uses it too so in-process runs get the same defaults"""
     parser = argparse.ArgumentParser(description="Fetch Reddit posts and comments for F1 sessions")
     parser.add_argument("--subreddit", default="formula1", help="Subreddit to search")
     parser.add_argument("--post_limit", type=int, default=50, help="Maximum number of posts to fetch")
@@ -248,20 +373,34 @@ def main():
     parser.add_argument("--year", type=int, default=None, help="Year of the race")
     parser.add_argument("--round", type=int, default=None, help="Round number of the race")
     parser.add_argument("--export_csv", action="store_true", help="export results to csv")
-    args = parser.parse_args()
+    parser.add_argument("--refresh_cache", action="store_true", help="re-download race info instead of using the cached copy")
+    parser.add_argument("--max_workers", type=int, default=MAX_WORKERS, help="Maximum number of posts to fetch comments for concurrently")
+    return parser
+
+def RunScrape(args: argparse.Namespace, scraper: Optional[RedditScraper] = None) -> Dict:
+    """
+    Scrapes & stores posts/comments for one race session.
+    Args:
+        args: parsed BuildArgParser() arguments
+        scraper: optional existing RedditScraper, lets repeated runs reuse its auth token & connection pool
 
+    Returns:
+        Dictionary of the search summary counts
+    """
     try:
         print(f"DEBUG: Starting scraper with args: {args}")
         
         db = F1Database()
 
-        scraper = RedditScraper(
-            client_id=os.getenv("CLIENT_ID"),
-            client_secret=os.getenv("CLIENT_SECRET"),
-            user_agent=os.getenv("USER_AGENT")
-        )
+        if scraper is None:
+            scraper = RedditScraper(
+                client_id=os.getenv("CLIENT_ID"),
+                client_secret=os.getenv("CLIENT_SECRET"),
+                user_agent=os.getenv("USER_AGENT"),
+                max_workers=max(1, args.max_workers)
+            )
                 
-        race_info = GetRaceInfo(args.year, args.round)
+        race_info = GetRaceInfo(args.year, args.round, args.refresh_cache)
         race_data = race_info["Races"]  
         db.insert_race(race_data)
         
@@ -269,8 +408,8 @@ def main():
         sub = scraper.reddit.subreddit(args.subreddit)
 
         session_upper = args.session.upper()
-        if session_upper not in SESSION_CONFIG:
-            raise ValueError(f"Invalid session type: {args.session}. Valid options are: {list(SESSION_CONFIG.keys())}")
+        if session_upper not in SESSION_KEYWORDS:
+            raise ValueError(f"Invalid session type: {args.session}. Valid options are: {list(SESSION_KEYWORDS.keys())}")
         
         if not ValidateSessionExists(session_upper, session_dates):
             available_sessions = [k for k in session_dates.keys() if k != 'date']
@@ -279,32 +418,19 @@ def main():
                 f"Available sessions: {available_sessions}"
             )
         
-        keywords = SESSION_CONFIG[session_upper]['keywords']
+        keywords = SESSION_KEYWORDS[session_upper]
+        keyword_re = SESSION_RE[session_upper]
         
         race_date = datetime.strptime(race_data["date"], "%Y-%m-%d")
         
-        session_date_key = None
-        if args.session.upper() == "FP1":
-            session_date_key = "FirstPractice"
-        elif args.session.upper() == "FP2":
-            session_date_key = "SecondPractice"
-        elif args.session.upper() == "FP3":
-            session_date_key = "ThirdPractice"
-        elif args.session.upper() == "QUALIFYING":
-            session_date_key = "Qualifying"
-        elif args.session.upper() == "SPRINT":
-            session_date_key = "Sprint"
-        elif args.session.upper() == "SPRINT QUALIFYING":
-            session_date_key = "SprintQualifying"
-        elif args.session.upper() == "RACE":
-            session_date_key = "date"
+        session_date_key = SESSION_DATE_KEYS.get(session_upper)
 
         if session_date_key and session_date_key in session_dates:
             session_date = datetime.strptime(session_dates[session_date_key], "%Y-%m-%d")
-            session_start, session_end = GetSessionWindow(args.session.upper(), session_date)
+            session_start, session_end = GetSessionWindow(session_upper, session_date)
         else:
             print(f"WARNING: Session date not found for {args.session}, using race date as fallback")
-            session_start, session_end = GetSessionWindow(args.session.upper(), race_date)
+            session_start, session_end = GetSessionWindow(session_upper, race_date)
         
         start_epoch = int(session_start.timestamp())
         end_epoch = int(session_end.timestamp())
@@ -321,112 +447,107 @@ def main():
         comments_inserted = 0
         
         race_name_clean = race_data["raceName"].replace("Grand Prix", "").strip()
+        race_name_cf = race_data["raceName"].casefold()
+        race_name_clean_cf = race_name_clean.casefold()
+        session_lower = args.session.lower()
         search_queries = [
             f'"{race_data["raceName"]}"',
             f'"{race_name_clean}"',
-            f'"{race_data["raceName"]}" {args.session.lower()}',
-            f'{race_name_clean} {args.session.lower()}',
-            f'"{args.session.upper()}"', 
-            f'"{args.session.upper()} discussion"',  
-            f'"{args.session.upper()} thread"', 
+            f'"{race_data["raceName"]}" {session_lower}',
+            f'{race_name_clean} {session_lower}',
+            f'"{session_upper}"', 
+            f'"{session_upper} discussion"',  
+            f'"{session_upper} thread"', 
         ]
         
-        for query in search_queries:
+        #only exact repeats (race names without "Grand Prix") r dropped. each phrasing keeps its own
+        #search & post_limit, the broad session only ones would crowd the race ones out of a shared top list
+        search_queries = list(dict.fromkeys(search_queries))
+
+        #queries r independent so run them all at once, results still get checked in query order below
+        with ThreadPoolExecutor(max_workers=max(1, min(args.max_workers, len(search_queries)))) as executor:
+            searches = [(query, executor.submit(SearchPosts, sub, query, args.post_limit)) for query in search_queries]
+
+        matched_posts = {}
+        for query, search in searches:
             print(f"DEBUG: Searching with query: {query}")
             try:
-                for post in sub.search(query, time_filter="all", sort="top", limit=args.post_limit):
+                for post in search.result():
                     posts_checked += 1
                     post_time = post.created_utc
-                    post_datetime = datetime.fromtimestamp(post_time, tz=timezone.utc)
-                    
-                    print(f"DEBUG: Post {posts_checked}: '{post.title[:60]}...' created at {post_datetime}")
-                    
+                
+                    logging.debug("Post %d: '%.60s...' created at %s", posts_checked, post.title, post_time)
+                
                     if start_epoch <= post_time <= end_epoch:
                         posts_in_date_range += 1
-                        print(f"DEBUG: Post {posts_checked} is in date range")
-                        
-                        title_lower = post.title.lower()
-                        if any(kw in title_lower for kw in keywords):
-                            posts_matched += 1
-                            print(f"DEBUG: Post {posts_checked} matches keywords, processing...")
-                            
-                            rec = ProcessPost(post, args.session, args.comment_limit)
-                            if rec:
-                                print(f"DEBUG: Attempting to insert post {rec['posts']['id']}")
-                                
-                                post_success = db.insert_post(rec["posts"], race_data)
-                                if post_success:
-                                    posts_inserted += 1
-                                    print(f"DEBUG: Successfully inserted post {rec['posts']['id']}")
-                                else:
-                                    print(f"DEBUG: Failed to insert post {rec['posts']['id']}")
-                                
-                                comment_success_count = 0
-                                for comment in rec["comments"]:
-                                    comment_success = db.insert_comment(comment, rec["posts"]["id"], race_data)
-                                    if comment_success:
-                                        comments_inserted += 1
-                                        comment_success_count += 1
-                                
-                                print(f"DEBUG: Inserted {comment_success_count}/{len(rec['comments'])} comments for post {rec['posts']['id']}")
+                        logging.debug("Post %d is in date range", posts_checked)
+                    
+                        title_lower = post.title.casefold()
+                        if keyword_re.search(title_lower):
+                            if post.id not in matched_posts:
+                                matched_posts[post.id] = post
+                                posts_matched += 1
+                                logging.debug("Post %d matches keywords, queued for processing", posts_checked)
                         else:
-                            print(f"DEBUG: Post {posts_checked} doesn't match keywords: {title_lower}")
+                            logging.debug("Post %d doesn't match keywords: %s", posts_checked, title_lower)
                     else:
-                        print(f"DEBUG: Post {posts_checked} outside date range")
-                        
+                        logging.debug("Post %d outside date range", posts_checked)
+                    
             except Exception as e:
                 print(f"DEBUG: Error searching with query '{query}': {e}")
-                continue
         
         if posts_matched < 5:
             print(f"DEBUG: Only found {posts_matched} posts via search, trying recent posts...")
+            race_name_parts = race_name_clean_cf.split()
+            race_name_re = re.compile("|".join(re.escape(part) for part in ReduceKeywords(tuple(race_name_parts + [race_name_cf]))))
+            initial_matched = posts_matched
             try:
-                for post in sub.new(limit=1000): 
+                for post_data in FetchNewPosts(scraper.reddit, args.subreddit, start_epoch - 86400 * 7):
                     posts_checked += 1
-                    post_time = post.created_utc
+                    post_time = post_data["created_utc"]
                     
                     if post_time < start_epoch - 86400 * 7: 
                         break
                         
                     if start_epoch <= post_time <= end_epoch:
                         posts_in_date_range += 1
-                        title_lower = post.title.lower()
+                        title_lower = post_data["title"].casefold()
                         
-                        race_name_parts = race_name_clean.lower().split()
-                        if (any(kw in title_lower for kw in keywords) and 
-                            (any(part in title_lower for part in race_name_parts) or 
-                             race_data["raceName"].lower() in title_lower)):
-                            
-                            posts_matched += 1
-                            print(f"DEBUG: Found matching post via new(): '{post.title[:60]}...'")
+                        if keyword_re.search(title_lower) and race_name_re.search(title_lower):
                             
-                            rec = ProcessPost(post, args.session, args.comment_limit)
-                            if rec:
-                                print(f"DEBUG: Attempting to insert post {rec['posts']['id']}")
-                                
-                                post_success = db.insert_post(rec["posts"], race_data)
-                                if post_success:
-                                    posts_inserted += 1
-                                    print(f"DEBUG: Successfully inserted post {rec['posts']['id']}")
-                                else:
-                                    print(f"DEBUG: Failed to insert post {rec['posts']['id']}")
-                                
-                                comment_success_count = 0
-                                for comment in rec["comments"]:
-                                    comment_success = db.insert_comment(comment, rec["posts"]["id"], race_data)
-                                    if comment_success:
-                                        comments_inserted += 1
-                                        comment_success_count += 1
-                                
-                                print(f"DEBUG: Inserted {comment_success_count}/{len(rec['comments'])} comments for post {rec['posts']['id']}")
+                            if post_data["id"] not in matched_posts:
+                                matched_posts[post_data["id"]] = Submission(scraper.reddit, _data=post_data)
+                                posts_matched += 1
+                                logging.debug("Found matching post via new(): '%.60s...'", post_data['title'])
+
+                                #got enough, stop here so FetchNewPosts doesn't request any more pages
+                                if posts_matched - initial_matched >= args.post_limit:
+                                    break
                         else:
-                            print(f"DEBUG: Post {posts_checked} doesn't match keywords: {title_lower}")
+                            logging.debug("Post %d doesn't match keywords: %s", posts_checked, title_lower)
                     else:
-                        print(f"DEBUG: Post {posts_checked} outside date range")
+                        logging.debug("Post %d outside date range", posts_checked)
                         
             except Exception as e:
                 print(f"DEBUG: Error browsing new posts: {e}")
 
+        logging.debug("Fetching comments for %d posts with up to %d workers", len(matched_posts), args.max_workers)
+        results = ProcessPosts(list(matched_posts.values()), args.session, args.comment_limit, max(1, args.max_workers))
+
+        #everything goes in as one transaction per table instead of a connection & commit per row
+        posts_batch = []
+        comments_batch = []
+        for rec in results:
+            if not rec:
+                continue
+            post_row, comment_rows = rec
+            posts_batch.append(post_row)
+            comments_batch.extend((post_row.id, comment) for comment in comment_rows)
+
+        posts_inserted = db.insert_posts_bulk(posts_batch, race_data)
+        comments_inserted = db.insert_comments_bulk(comments_batch, race_data)
+        logging.debug("Inserted %d/%d posts & %d/%d comments", posts_inserted, len(posts_batch), comments_inserted, len(comments_batch))
+
         print(f"DEBUG: Search Summary:")
         print(f"  - Total posts checked: {posts_checked}")
         print(f"  - Posts in date range: {posts_in_date_range}")
@@ -434,6 +555,9 @@ def main():
         print(f"  - Posts inserted: {posts_inserted}")
         print(f"  - Comments inserted: {comments_inserted}")
 
+        if posts_batch and not posts_inserted:
+            raise RuntimeError(f"Database error, none of the {len(posts_batch)} posts found for {args.session} session of {race_data['raceName']} could be stored in {db.db_path}")
+
         if not posts_inserted:
             raise ValueError(f"No Reddit posts found for {args.session} session of {race_data['raceName']} ({race_data['season']} Round {race_data['round']})")
         
@@ -444,15 +568,35 @@ def main():
                 session=args.session,
                 year=int(race_data["season"])
             )
-            db.export_to_csv(args.session, race_data["round"], race_data["season"], filename)
-            logging.info(f"Exported data to {filename}")
+            exported_files = db.export_to_csv(args.session, race_data["round"], race_data["season"], filename)
+            logging.info(f"Exported data to {', '.join(exported_files)}")
         else:
             logging.info(f"Successfully inserted {posts_inserted} posts and {comments_inserted} comments into database")
+
+        return {
+            "posts_checked": posts_checked,
+            "posts_in_date_range": posts_in_date_range,
+            "posts_matched": posts_matched,
+            "posts_inserted": posts_inserted,
+            "comments_inserted": comments_inserted
+        }
         
     except Exception as e:
         logging.error(f"Error in main: {e}")
         print(f"DEBUG: Exception details: {type(e).__name__}: {e}")
         raise
 
+def main():
+    EnsureEnv()
+    ValidateEnvVars()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    args = BuildArgParser().parse_args()
+    RunScrape(args)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
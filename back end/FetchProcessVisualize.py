@@ -1,12 +1,22 @@
+import os
 import sys
 import time
 import json
+import orjson
 import logging
 import requests
 import argparse
+import threading
 import subprocess
-from datetime import datetime, date
+import importlib.util
+from datetime import date
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from ergast import HTTP_SESSION, HTTP_TIMEOUT, ERGAST_SEASON_TTL
+
+#race/session scrapes run at once. they'd share one reddit client & prawcore's rate limiter/authorizer aren't locked,
+#so concurrent scrapes race on them & the 429s get swallowed as dropped posts. stays 1 until requests r serialised
+MAX_CONCURRENT_SCRAPES = 1
 
 class F1BatchScraper:
     def __init__(self, script_path: str = "back end/FetchPosts&Comments.py", process_script_path: str = "back end/ProcessText.py", visualize_script_path: str = "back end/VisualizeSentiment.py"):
@@ -14,6 +24,38 @@ class F1BatchScraper:
         self.process_script_path = process_script_path
         self.visualize_script_path = visualize_script_path
         self.sessions = ["Race"]
+        self.scrape_module = None
+        self.reddit_scraper = None
+        self.reddit_pool_size = 0
+        self.scrape_lock = threading.Lock()
+
+    def load_scraper(self, max_concurrent: int = 1):
+        """
+        Imports the scraper script once & keeps one reddit client for every run, so each
+        race/session doesn't pay for a new interpreter, the imports & a fresh reddit login.
+        The client's connection pool fits max_concurrent scrapes each fetching w/ MAX_WORKERS threads
+        """
+        with self.scrape_lock:
+            if self.scrape_module is None:
+                #file name has a & in it so it can't be a normal import
+                spec = importlib.util.spec_from_file_location("fetch_posts_comments", self.script_path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+
+                module.EnsureEnv()
+                module.ValidateEnvVars()
+                self.scrape_module = module
+
+            pool_size = max(1, max_concurrent) * self.scrape_module.MAX_WORKERS
+            if pool_size > self.reddit_pool_size:
+                self.reddit_scraper = self.scrape_module.RedditScraper(
+                    client_id=os.getenv("CLIENT_ID"),
+                    client_secret=os.getenv("CLIENT_SECRET"),
+                    user_agent=os.getenv("USER_AGENT"),
+                    max_workers=pool_size
+                )
+                self.reddit_pool_size = pool_size
+        return self.scrape_module
     
     def get_completed_races(self, year: int) -> List[Dict]:
         """
@@ -23,25 +65,25 @@ class F1BatchScraper:
             url = f"https://api.jolpi.ca/ergast/f1/{year}.json"
             print(f"fetching data from: {url}")
 
-            response = requests.get(url)
+            response = HTTP_SESSION.get(url, timeout=HTTP_TIMEOUT, expire_after=ERGAST_SEASON_TTL)
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
             races = data["MRData"]["RaceTable"]["Races"]
 
-            current_date = datetime.now().date()
+            #ergast dates r ISO YYYY-MM-DD so plain string comparison orders them correctly
+            current_date = date.today().isoformat()
             completed_races = []
             
             for race in races:
-                race_date = datetime.strptime(race["date"], "%Y-%m-%d").date()
-                
-                if race_date <= current_date:
+                if race["date"] <= current_date:
                     race_info = {
                         "round" : int(race["round"]),
                         "race_name" : race["raceName"],
                         "circuit_name" : race["Circuit"]["circuitName"],
                         "date" : race["date"],
-                        "year" : year
+                        "year" : year,
+                        "is_sprint" : HasSprintSession(race)
                     }
                     completed_races.append(race_info)
 
@@ -58,12 +100,11 @@ class F1BatchScraper:
         
     def execute_scraper(self, year: int, round_num: int, session: str, **kwargs) -> bool:
         """
-        Runs FetchPosts&Comments.py with the given parameters
+        Runs the FetchPosts&Comments.py scrape in process with the given parameters
         Returns true if successful, else false
         """
         try:
-            cmd = [
-                "python", self.script_path, 
+            cli_args = [
                 "--year", str(year), 
                 "--round", str(round_num),
                 "--session", session
@@ -72,48 +113,39 @@ class F1BatchScraper:
             scraper_params = ["subreddit", "post_limit", "comment_limit", "export_csv"]
             for key, value in kwargs.items():
                 if value is not None and key in scraper_params:
-                    cmd.extend([f"--{key}", str(value)])
+                    if key == "export_csv":
+                        if value:
+                            cli_args.append("--export_csv")
+                    else:
+                        cli_args.extend([f"--{key}", str(value)])
 
-            print(f"Running: {' '.join(cmd)}")
+            print(f"Running scraper: {' '.join(cli_args)}")
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            scrape_module = self.load_scraper()
+            args = scrape_module.BuildArgParser().parse_args(cli_args)
+            summary = scrape_module.RunScrape(args, self.reddit_scraper)
 
-            if result.returncode==0:
-                print(f"Successfully scraped {year} Round {round_num} & {session}")
-                if result.stdout:
-                    for line in result.stdout.split('\n'):
-                        if 'Successfully wrote' in line or 'records to' in line:
-                            print(f"{line}")
+            print(f"Successfully scraped {year} Round {round_num} & {session}")
+            print(f"Stored {summary['posts_inserted']} posts and {summary['comments_inserted']} comments")
 
-                if kwargs.get('process_sentiment', True):
-                    print(f"Processing sentiment for {year} Round {round_num} {session}...")
-                    sentiment_success = self.execute_processor(year, round_num, session)
+            self.post_process(year, round_num, session, **kwargs)
+            return True
 
-                    if sentiment_success and kwargs.get('create_visualizations', True):
-                        print(f"Creating visualizations for {year} Round {round_num} {session}...")
-                        self.execute_visualizer(year, round_num, session, save_to_db=kwargs.get('save_visualizations', True))
-                
-                return True
-            else:
-                print(f"Failed to scrape {year} Round {round_num} & {session}")
-                if result.stderr:
-                    print(f"Error: {result.stderr.strip()}")
-                return False
-        
-        except subprocess.TimeoutExpired:
-            print(f"Timeout scraping {year} Round {round_num} & {session}")
-            return False
-
-        except Exception as e:
-            print(f"Exception scraping {year} Round {round_num} & {session}")
+        except (Exception, SystemExit) as e:
+            print(f"Failed to scrape {year} Round {round_num} & {session}: {e}")
             return False
         
-    def scrape_all_races(self, year: int, sessions: Optional[List[str]] = None, start_round: int = 1, end_round: Optional[int] = None, **scraper_params) ->Dict[str, int]:
+    def post_process(self, year: int, round_num: int, session: str, **kwargs):
+        """Runs the sentiment pass & visualizations for a scraped session, unless turned off in kwargs"""
+        if kwargs.get('process_sentiment', True):
+            print(f"Processing sentiment for {year} Round {round_num} {session}...")
+            sentiment_success = self.execute_processor(year, round_num, session)
+
+            if sentiment_success and kwargs.get('create_visualizations', True):
+                print(f"Creating visualizations for {year} Round {round_num} {session}...")
+                self.execute_visualizer(year, round_num, session, save_to_db=kwargs.get('save_visualizations', True))
+
+    def scrape_all_races(self, year: int, sessions: Optional[List[str]] = None, start_round: int = 1, end_round: Optional[int] = None, max_concurrent: int = MAX_CONCURRENT_SCRAPES, **scraper_params) ->Dict[str, int]:
         """
         Scrapes all races for given year
         """
@@ -132,11 +164,12 @@ class F1BatchScraper:
         print(f"Starting batch scrape for {len(completed_races)} races")
         print("=" * 60)
 
+        jobs = []
         for race in completed_races:
             race_round = race["round"]
             race_name = race["race_name"]
             
-            race_sessions = get_sessions_for_race(year, race_round, sessions)
+            race_sessions = get_sessions_for_race(year, race_round, sessions, is_sprint=race["is_sprint"])
             
             if not race_sessions:
                 print(f"No valid sessions found for {year} Round {race_round} ({race_name})")
@@ -144,21 +177,27 @@ class F1BatchScraper:
             
             print(f"Processing round {race_round}: {race_name} ({race['date']})")
             print(f"  Sessions to scrape: {', '.join(race_sessions)}")
-            
-            for session in race_sessions:
-                stats["total"] += 1
-                
-                success = self.execute_scraper(
-                    year=year,
-                    round_num=race_round,
-                    session=session, 
-                    **scraper_params
-                )
-                if success:
-                    stats["successful"] += 1
-                else:
-                    stats["failed"] += 1
-            print() 
+            jobs.extend((race_round, session) for session in race_sessions)
+        print()
+
+        #scrapes r network bound so several run at once, sentiment & visuals stay serial
+        #afterwards since they're cpu/memory heavy (one model load at a time)
+        scrape_only = {**scraper_params, "process_sentiment": False}
+        #client is set up before the threads start so its pool already fits every concurrent scrape
+        self.load_scraper(max_concurrent)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrent)) as executor:
+            results = list(executor.map(
+                lambda job: self.execute_scraper(year=year, round_num=job[0], session=job[1], **scrape_only),
+                jobs
+            ))
+
+        for (race_round, session), success in zip(jobs, results):
+            stats["total"] += 1
+            if success:
+                stats["successful"] += 1
+                self.post_process(year, race_round, session, **scraper_params)
+            else:
+                stats["failed"] += 1
         
         return stats
     
@@ -196,42 +235,16 @@ class F1BatchScraper:
         return stats
 
     def execute_processor(self, year: int, round_num: int, session: Optional[str] = None) -> bool:
-        """Runs ProcessText.py with given parameters & returns true if successful, else false :3"""
+        """Runs the ProcessText.py sentiment pass in process & returns true if successful, else false :3"""
         try: 
-            cmd = [
-                "python", self.process_script_path,
-                "--year", str(year),
-                "--round", str(round_num)
-            ]
-
-            if session:
-                cmd.extend(["--session", session])
+            print(f"Running processor for {year} Round {round_num} {session or 'all sessions'}")
 
-            print(f"Running processor: {' '.join(cmd)}")
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            #imported on first use, the sentiment models r heavy & only needed once scraping succeeds
+            from ProcessText import process_sentiment_from_db
+            process_sentiment_from_db(race_round=round_num, race_year=year, session=session or "")
 
-            if(result.returncode == 0):
-                print(f"Successfully processed sentiment for {year} Round {round_num} {session or 'all sessions'}")
-                if result.stdout:
-                    for line in result.stdout.split('\n'):
-                        if 'Results saved to' in line or 'Processing batch' in line:
-                            print(f"  {line}")
-                return True
-            else:
-                print(f"Failed to process sentiment for {year} Round {round_num} {session or 'all sessions'}")
-                if result.stderr:
-                    print(f"Error: {result.stderr.strip()}")
-                return False
-        
-        except subprocess.TimeoutExpired:
-            print(f"Timeout processing sentiment for {year} Round {round_num} {session or 'all sessions'}")
-            return False
+            print(f"Successfully processed sentiment for {year} Round {round_num} {session or 'all sessions'}")
+            return True
 
         except Exception as e:
             print(f"Exception processing sentiment for {year} Round {round_num} {session or 'all sessions'}: {e}")
@@ -282,26 +295,27 @@ class F1BatchScraper:
             print(f"Exception creating visualizations for {year} Round {round_num} {session or 'all sessions'}: {e}")
             return False
 
+def HasSprintSession(race: Dict) -> bool:
+    """true if an ergast race entry lists a sprint, the season calendar already carries this"""
+    return any("sprint" in key.lower() for key in race)
+
 def IsSprintWeekend(year: int, race_round) -> bool:
     """detects if a race round is a sprint weekend"""
     try:
         url = f"https://api.jolpi.ca/ergast/f1/{year}/{race_round}.json"
         print(f"Checking sprint status for {year} Round {race_round}: {url}")
 
-        response = requests.get(url)
+        response = HTTP_SESSION.get(url, timeout=HTTP_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         races = data["MRData"]["RaceTable"]["Races"]
         if not races:
             print(f"No races found for {year} Round {race_round}")
             return False
 
-        race = races[0];
-        race_json_str = json.dumps(race, indent=2).lower()
-
-        sprint_terms = ["sprint", "sprint qualifying"]
-        has_sprint = any(term in race_json_str for term in sprint_terms)
+        race = races[0]
+        has_sprint = HasSprintSession(race)
         
         if has_sprint:
             print(f"{year} Round {race_round} ({race.get('raceName', 'Unknown')}) is a SPRINT weekend")
@@ -320,12 +334,14 @@ def IsSprintWeekend(year: int, race_round) -> bool:
         print(f"Unexpected error checking sprint status for {year} Round {race_round}: {e}")
         return False
 
-def get_sessions_for_race(year: int, race_round: int, user_sessions: Optional[List[str]] = None) -> List[str]:
+def get_sessions_for_race(year: int, race_round: int, user_sessions: Optional[List[str]] = None, is_sprint: Optional[bool] = None) -> List[str]:
     """
     Gets the appropriate sessions for a specific race round.
     If user_sessions is provided, filters it based on weekend type.
+    is_sprint can be passed in when the caller already has the calendar, otherwise its looked up per round.
     """
-    is_sprint = IsSprintWeekend(year, race_round)
+    if is_sprint is None:
+        is_sprint = IsSprintWeekend(year, race_round)
     available_sessions = []
 
     if is_sprint:
@@ -360,6 +376,7 @@ def main():
     parser.add_argument("--post_limit", type=int, default=200, help="Post limit per session")
     parser.add_argument("--comment_limit", type=int, default=25, help="Comment limit per post")
     parser.add_argument("--config", type=str, default=None, help="JSON string of specific race configs (for specific mode)")
+    parser.add_argument("--max_concurrent", type=int, default=MAX_CONCURRENT_SCRAPES, help=f"Race/session scrapes to run at once, >1 shares an unlocked reddit client (default: {MAX_CONCURRENT_SCRAPES})")
     parser.add_argument("--no_sentiment", action="store_true", help="Skip sentiment processing")
     parser.add_argument("--no_visualizations", action="store_true", help="Skip visualization creation")
     parser.add_argument("--no_save_visualizations", action="store_true", help="Create visualizations but don't save to database")
@@ -389,6 +406,7 @@ def main():
                 year_stats = scraper.scrape_all_races(
                     year=year,
                     sessions=args.sessions,  
+                    max_concurrent=args.max_concurrent,
                     **scraper_params
                 )
                 for key in total_stats:
@@ -402,6 +420,7 @@ def main():
                 sessions=args.sessions,
                 start_round=args.start_round,
                 end_round=args.end_round,
+                max_concurrent=args.max_concurrent,
                 **scraper_params
             )
 
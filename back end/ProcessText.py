@@ -1,16 +1,16 @@
+import os
 import re
 import nltk
+import functools
 import argparse
 import emoji
 import logging
 import pandas as pd
-import numpy as np
 from database import F1Database
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from nltk.sentiment import SentimentIntensityAnalyzer
 from textblob import TextBlob
-from transformers import pipeline
+from joblib import Parallel, delayed
 from datetime import datetime
 
 logging.basicConfig(
@@ -18,6 +18,21 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+BERT_BATCH_SIZE = 32 #texts per BERT forward pass
+#worker processes for the VADER/TextBlob pass, each one imports this module so keep it to a few
+SENTIMENT_JOBS = max(1, min(4, (os.cpu_count() or 1) - 1))
+#below this starting the workers costs more than it saves. measured ~0.5ms/text serial for clean + VADER + TextBlob
+#& ~2s to start 3 cold workers, so even a perfect 3x split only breaks even around 6-7k texts
+PARALLEL_MIN_TEXTS = 10_000
+CLEAN_CACHE_SIZE = 200_000 #cleaned strings kept by clean_str
+LEXICON_CACHE_SIZE = 100_000 #texts whose F1 term matches r kept per lexicon
+
+#keys returned by MultiModelSentimentAnalyzer.ensemble_analysis, in column order
+SENTIMENT_RESULT_COLUMNS = (
+    'ensemble_score', 'sentiment_category', 'vader_score', 'textblob_polarity', 'textblob_subjectivity',
+    'bert_score', 'bert_label', 'model_agreement', 'f1_keywords'
+)
+
 class F1SentimentLexicon:
     def __init__(self):
         self.f1_positive_words = {
@@ -112,23 +127,41 @@ class F1SentimentLexicon:
             }
         }
 
+        #each context list compiled into one alternation so a context word costs 2 scans of the text, not one per phrase
+        self.f1_context_patterns = {
+            word: (
+                re.compile('|'.join(map(re.escape, info['positive_contexts']))),
+                re.compile('|'.join(map(re.escape, info['negative_contexts'])))
+            )
+            for word, info in self.f1_context_words.items()
+        }
+
+        #positive & negative merged so scoring is one lookup per word, positive wins on a clash like before
+        self.f1_word_scores = {**self.f1_negative_words, **self.f1_positive_words}
+        self.f1_keyword_set = frozenset(self.f1_word_scores) | frozenset(self.f1_neutral_words) | frozenset(self.f1_context_words)
+
+        #every lexicon term in one pattern, longest first so "pole position" wins over "pole". a term only
+        #matches between whitespace like a split() token would, but multi word terms can match now too
+        self.f1_term_re = re.compile(
+            r'(?<!\S)(?:' + '|'.join(map(re.escape, sorted(self.f1_keyword_set, key=len, reverse=True))) + r')(?!\S)'
+        )
+        #vader & textblob both score & extract keywords from the same text, so its scanned once & reused
+        self._find_terms = functools.lru_cache(maxsize=LEXICON_CACHE_SIZE)(self.f1_term_re.findall)
+
     def get_f1_sentiment_score(self, text, base_sentiment_score=0.0):
         if not text:
             return base_sentiment_score
 
         text_lower = text.lower()
-        words = text_lower.split()
+        words = self._find_terms(text_lower)
 
         f1_adjustment = 0.0
         word_count = 0
 
         for word in words:
-            if word in self.f1_positive_words:
-                f1_adjustment += self.f1_positive_words[word]
-                word_count += 1
-
-            elif word in self.f1_negative_words:
-                f1_adjustment += self.f1_negative_words[word]
+            score = self.f1_word_scores.get(word)
+            if score is not None:
+                f1_adjustment += score
                 word_count += 1
 
             elif word in self.f1_context_words:
@@ -148,13 +181,9 @@ class F1SentimentLexicon:
         context_info = self.f1_context_words[word]
         default_score = context_info['default_score']
         
-        positive_context_found = any(
-            context in text for context in context_info['positive_contexts']
-        )
-        
-        negative_context_found = any(
-            context in text for context in context_info['negative_contexts']
-        )
+        positive_re, negative_re = self.f1_context_patterns[word]
+        positive_context_found = positive_re.search(text) is not None
+        negative_context_found = negative_re.search(text) is not None
         
         if positive_context_found and not negative_context_found:
             return min(default_score + 0.2, 1.0)  
@@ -167,26 +196,21 @@ class F1SentimentLexicon:
         if not text:
             return []
             
-        text_lower = text.lower()
-        words = text_lower.split()
-        
-        f1_keywords = []
-        for word in words:
-            if (word in self.f1_positive_words or 
-                word in self.f1_negative_words or 
-                word in self.f1_neutral_words or
-                word in self.f1_context_words):
-                f1_keywords.append(word)
-                
-        return f1_keywords
+        return list(self._find_terms(text.lower()))
 
 class MultiModelSentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, load_bert=True):
         self.vader_analyzer = SentimentIntensityAnalyzer()
         self.textblob_analyzer = TextBlob
         self.f1_lexicon = F1SentimentLexicon()
+        self.bert_analyzer = None
+
+        if not load_bert:
+            return
 
         try:
+            #imported here so the joblib workers, which only run VADER & TextBlob, never load transformers/torch
+            from transformers import pipeline
             self.bert_analyzer = pipeline(
                 "sentiment-analysis", 
                 model="cardiffnlp/twitter-roberta-base-sentiment-latest",
@@ -197,6 +221,10 @@ class MultiModelSentimentAnalyzer:
             self.bert_analyzer = None
 
     def analyze_vader(self, text):
+        #empty text (common once clean_text strips links & symbols) gets what vader would score it, w/o running it
+        if not text:
+            return {'compound': 0.0, 'positive': 0.0, 'negative': 0.0, 'neutral': 0.0, 'f1_keywords': []}
+
         try:
             scores = self.vader_analyzer.polarity_scores(text)
 
@@ -217,6 +245,9 @@ class MultiModelSentimentAnalyzer:
             return {'compound': 0, 'positive': 0, 'negative': 0, 'neutral': 1, 'f1_keywords': []}
 
     def analyze_textblob(self, text):
+        if not text:
+            return {'polarity': 0.0, 'subjectivity': 0.0, 'f1_keywords': []}
+
         try:
             blob = self.textblob_analyzer(text)
 
@@ -234,37 +265,85 @@ class MultiModelSentimentAnalyzer:
             return {'polarity': 0, 'subjectivity': 0.5, 'f1_keywords': []}
 
     def analyze_bert(self, text):
-        if not self.bert_analyzer:
+        if not self.bert_analyzer or not text:
             return {'bert_score': 0, 'bert_label': 'neutral'}
         
         try:
             if len(text) > 500:
                 text = text[:500]
             
-            result = self.bert_analyzer(text)[0]
-            
-            label_scores = {item['label']: item['score'] for item in result}
-            
-            if 'negative' in label_scores and 'positive' in label_scores:
-                bert_score = label_scores['positive'] - label_scores['negative']
-            else:
-                bert_score = 0
-            
-            return {
-                'bert_score': bert_score,
-                'bert_label': max(result, key=lambda x: x['score'])['label']
-            }
+            return self._bert_scores(self.bert_analyzer(text)[0])
         except Exception as e:
             logging.error(f"BERT analysis error: {e}")
             return {'bert_score': 0, 'bert_label': 'neutral'}
 
-    def ensemble_analysis(self, text, weights=None):
-        if weights is None:
-            weights = {'vader': 0.4, 'textblob': 0.3, 'bert': 0.3}
+    def analyze_bert_batch(self, texts):
+        """runs BERT over a list of texts in batches, one pipeline call instead of one per text"""
+        if not self.bert_analyzer:
+            return [{'bert_score': 0, 'bert_label': 'neutral'} for _ in texts]
+
+        #empty texts stay neutral & r left out of the forward passes
+        scores = [{'bert_score': 0, 'bert_label': 'neutral'} for _ in texts]
+        to_score = [pos for pos, text in enumerate(texts) if text]
+        if not to_score:
+            return scores
 
+        try:
+            results = self.bert_analyzer([texts[pos][:500] for pos in to_score], batch_size=BERT_BATCH_SIZE, truncation=True)
+            for pos, result in zip(to_score, results):
+                scores[pos] = self._bert_scores(result)
+            return scores
+        except Exception as e:
+            logging.error(f"BERT batch analysis error, falling back to per text: {e}")
+            return [self.analyze_bert(text) for text in texts]
+
+    def _bert_scores(self, result):
+        """turns the pipeline's per label scores for one text into a bert score & label"""
+        label_scores = {item['label']: item['score'] for item in result}
+        
+        if 'negative' in label_scores and 'positive' in label_scores:
+            bert_score = label_scores['positive'] - label_scores['negative']
+        else:
+            bert_score = 0
+        
+        return {
+            'bert_score': bert_score,
+            'bert_label': max(result, key=lambda x: x['score'])['label']
+        }
+
+    def ensemble_analysis(self, text, weights=None, bert_result=None):
+        """bert_result can be passed in when it was already computed w/ analyze_bert_batch"""
         vader_result = self.analyze_vader(text)
         textblob_result = self.analyze_textblob(text)
-        bert_result = self.analyze_bert(text)
+        if bert_result is None:
+            bert_result = self.analyze_bert(text)
+
+        return self.combine_results(vader_result, textblob_result, bert_result, weights)
+
+    def ensemble_analysis_batch(self, texts, weights=None, n_jobs=SENTIMENT_JOBS):
+        """
+        ensemble_analysis over a list of texts. BERT runs batched in this process, VADER & TextBlob
+        r pure python so big inputs get split across worker processes
+        """
+        logging.info(f"Running BERT over {len(texts)} items in batches of {BERT_BATCH_SIZE}")
+        bert_results = self.analyze_bert_batch(texts)
+
+        if n_jobs > 1 and len(texts) >= PARALLEL_MIN_TEXTS:
+            logging.info(f"Running VADER & TextBlob over {len(texts)} items in {n_jobs} processes")
+            lexical_results = map_chunks(analyze_lexical_chunk, texts, n_jobs)
+        else:
+            logging.info(f"Running VADER & TextBlob over {len(texts)} items")
+            lexical_results = [(self.analyze_vader(text), self.analyze_textblob(text)) for text in texts]
+
+        return [
+            self.combine_results(vader_result, textblob_result, bert_result, weights)
+            for (vader_result, textblob_result), bert_result in zip(lexical_results, bert_results)
+        ]
+
+    def combine_results(self, vader_result, textblob_result, bert_result, weights=None):
+        """weights the three model results into the ensemble score & category"""
+        if weights is None:
+            weights = {'vader': 0.4, 'textblob': 0.3, 'bert': 0.3}
 
         ensemble_score = (
             vader_result['compound'] * weights['vader'] +
@@ -292,16 +371,40 @@ class MultiModelSentimentAnalyzer:
         }
 
     def calculate_agreement(self, vader_result, textblob_result, bert_result):
-        scores = [
-        vader_result['compound'],
-        textblob_result['polarity'],
-        bert_result['bert_score']
-        ]
-            
-        std_dev = np.std(scores)
+        #population std dev of the 3 scores written out, np.std's array setup costs more than the math
+        a = vader_result['compound']
+        b = textblob_result['polarity']
+        c = bert_result['bert_score']
+
+        mean = (a + b + c) / 3.0
+        std_dev = (((a - mean) ** 2 + (b - mean) ** 2 + (c - mean) ** 2) / 3.0) ** 0.5
         agreement = max(0, 1 - std_dev)  
         return agreement
 
+def map_chunks(func, items, n_jobs=SENTIMENT_JOBS):
+    """
+    Runs func over chunks of items in joblib worker processes & joins the chunk results back in order.
+    func takes a list & returns one result per item. Workers r kept between calls so later passes reuse them
+    """
+    chunk_size = -(-len(items) // (n_jobs * 4))
+    chunks = Parallel(n_jobs=n_jobs)(
+        delayed(func)(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)
+    )
+    return [result for chunk in chunks for result in chunk]
+
+_lexical_analyzer = None
+
+def analyze_lexical_chunk(texts):
+    """
+    VADER & TextBlob results for a chunk of texts, runs in the joblib workers.
+    Each worker builds its own analyzer once, w/o loading BERT
+    """
+    global _lexical_analyzer
+    if _lexical_analyzer is None:
+        _lexical_analyzer = MultiModelSentimentAnalyzer(load_bert=False)
+
+    return [(_lexical_analyzer.analyze_vader(text), _lexical_analyzer.analyze_textblob(text)) for text in texts]
+
 def get_ordinal_suffix(num):
     num = int(num)
     if 10 <= num % 100 <= 20:
@@ -310,100 +413,140 @@ def get_ordinal_suffix(num):
         suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(num % 10, 'th')
     return f"{num}{suffix} place"
 
+#positions r almost always under 100, so those r looked up by their digits instead of formatted per match
+ORDINALS = {str(num): get_ordinal_suffix(num) for num in range(100)}
+
+def replace_ordinal(match):
+    digits = match.group(1)
+    return ORDINALS.get(digits) or get_ordinal_suffix(digits)
+
+#clean_text patterns, compiled once instead of rebuilt & looked up in re's cache on every call
+F1_TERMS = {
+    'drs': 'drs zone',
+    'f1': 'formula one',
+    'gp': 'grand prix',
+    'dnf': 'did not finish',
+    'dsq': 'disqualified',
+    'dnq': 'did not qualify',
+    'sc': 'safety car',
+    'vsc': 'virtual safety car',
+    'red flag': 'red flag',
+    'yellow flag': 'yellow flag',
+    'blue flag': 'blue flag',
+    'tyres': 'tires',
+    'tyre': 'tire',
+    'qualifying': 'qualifying',
+    'pole': 'pole position',
+    'grid': 'starting grid',
+    'lap': 'lap',
+    'laps': 'laps',
+    'overtake': 'overtake',
+    'overtaking': 'overtaking',
+    'championship': 'championship',
+    'points': 'points',
+    'penalty': 'penalty',
+    'penalties': 'penalties',
+    'box': 'pit box',
+    'strategy': 'strategy',
+    'compound': 'tire compound',
+    'intermediate': 'intermediate tires',
+    'wet': 'wet tires',
+    'fp1': 'free practice one',
+    'fp2': 'free practice two', 
+    'fp3': 'free practice three',
+}
+F1_TERMS_RE = re.compile('|'.join(r'\b' + re.escape(term) + r'\b' for term in F1_TERMS), flags=re.IGNORECASE)
+URL_RE = re.compile(r"http\S+")
+MD_LINK_RE = re.compile(r"\[.*?\]\(.*?\)")
+BRACKET_RE = re.compile(r"\[.*?\]")
+ORDINAL_RE = re.compile(r'p\s*[-.]?\s*(\d+)', flags=re.IGNORECASE)
+REPEAT_RE = re.compile(r'(.)\1{2,}')
+#one pass for both "non alphanumerics become spaces" & "collapse whitespace runs", the result is the same
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
 def clean_text(text):
+    if not isinstance(text, str):
+        if pd.isna(text):
+            return ""
+        text = str(text)
+
+    return clean_str(text)
+
+#reddit threads repeat a lot of text (quotes, bots, "lol"), so identical strings r only cleaned once
+@functools.lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def clean_str(text):
     try:
-        if pd.isna(text) or text == "":
+        if text == "":
             return ""
 
-        text = str(text).lower()
-        text = re.sub(r"http\S+", "", text)
-        text = re.sub(r"\[.*?\]\(.*?\)", "", text) 
-        text = re.sub(r"\[.*?\]", "", text) 
-        text = emoji.demojize(text, delimiters=(' ', ' '))
-
-        f1_terms = {
-            'drs': 'drs zone',
-            'f1': 'formula one',
-            'gp': 'grand prix',
-            'dnf': 'did not finish',
-            'dsq': 'disqualified',
-            'dnq': 'did not qualify',
-            'sc': 'safety car',
-            'vsc': 'virtual safety car',
-            'red flag': 'red flag',
-            'yellow flag': 'yellow flag',
-            'blue flag': 'blue flag',
-            'tyres': 'tires',
-            'tyre': 'tire',
-            'qualifying': 'qualifying',
-            'pole': 'pole position',
-            'grid': 'starting grid',
-            'lap': 'lap',
-            'laps': 'laps',
-            'overtake': 'overtake',
-            'overtaking': 'overtaking',
-            'championship': 'championship',
-            'points': 'points',
-            'penalty': 'penalty',
-            'penalties': 'penalties',
-            'box': 'pit box',
-            'strategy': 'strategy',
-            'compound': 'tire compound',
-            'intermediate': 'intermediate tires',
-            'wet': 'wet tires',
-            'fp1': 'free practice one',
-            'fp2': 'free practice two', 
-            'fp3': 'free practice three',
-        }
+        text = text.lower()
+        text = URL_RE.sub("", text)
+        text = MD_LINK_RE.sub("", text) 
+        text = BRACKET_RE.sub("", text) 
+        #every emoji has a non ascii code point, so plain ascii text (most comments) can skip the lookup
+        if not text.isascii():
+            text = emoji.demojize(text, delimiters=(' ', ' '))
 
-        pattern = '|'.join(r'\b' + re.escape(term) + r'\b' for term in f1_terms.keys())
-        text = re.sub(pattern, lambda m: f1_terms[m.group().lower()], text, flags=re.IGNORECASE)
+        text = F1_TERMS_RE.sub(lambda m: F1_TERMS[m.group().lower()], text)
         
-        text = re.sub(r'p\s*[-.]?\s*(\d+)', lambda m: get_ordinal_suffix(m.group(1)), text, flags=re.IGNORECASE)
+        text = ORDINAL_RE.sub(replace_ordinal, text)
         
-        text = re.sub(r'(.)\1{2,}', r'\1', text)
-        text = re.sub(r"[^a-z0-9\s]", " ", text)
-        text = re.sub(r"\s+", " ", text).strip()
+        text = REPEAT_RE.sub(r'\1', text)
+        text = NON_ALNUM_RE.sub(" ", text).strip()
         return text
     except Exception as e:
         logging.error(f"Error cleaning text: {e}")
         return ""
 
-def tokenize_remove_stops(text):
+@functools.lru_cache(maxsize=None)
+def get_stopwords():
+    """loads the english stopwords once, downloading them the first time if needed"""
     try:
         nltk.data.find('corpora/stopwords')
     except LookupError:
         nltk.download('stopwords')
 
-    try:
-        nltk.data.find('tokenizers/punkt')
-    except LookupError:
-        nltk.download('punkt')
-    
-    stops = set(stopwords.words('english'))
-    tokens = word_tokenize(text)
-    
-    return [t for t in tokens if t not in stops and len(t)>1]
+    return frozenset(stopwords.words('english'))
+
+def tokenize_remove_stops(text):
+    #clean_text already leaves only lowercase alphanumerics & single spaces, so a plain split is enough.
+    #unlike word_tokenize it keeps words like "cannot" & "gonna" whole instead of splitting them treebank style
+    stops = get_stopwords()
+    return [t for t in text.split() if t not in stops and len(t)>1]
+
+#validate_sentiment_scores patterns, the driver/team one runs on cleaned text which is already lowercase
+NUMBER_RE = re.compile(r'\d+')
+DRIVER_TEAM_RE = re.compile(r'\b(hamilton|verstappen|leclerc|sainz|norris|russell|alonso|stroll|ocon|gasly|tsunoda|bottas|zhou|magnussen|hulkenberg|albon|sargeant|piastri|ricciardo|mercedes|ferrari|red bull|mclaren|aston martin|alpine|haas|williams|racing bulls|rb)\b')
+PUNCTUATION_RE = re.compile(r'[!?]{2,}')
+EMOJI_CODE_RE = re.compile(r':[a-z_]+:')
+
+def clean_and_tokenize_chunk(texts):
+    """<cleaned text, tokens> for a chunk of raw texts, runs in the joblib workers"""
+    results = []
+    for text in texts:
+        cleaned = clean_text(text)
+        results.append((cleaned, tokenize_remove_stops(cleaned)))
+    return results
 
 def validate_sentiment_scores(df):
     df['sentiment_confidence'] = 0.0
 
     df.loc[df['cleaned'].str.len() < 10, 'sentiment_confidence'] -= 0.3
 
-    number_count = df['cleaned'].str.count(r'\d+')
+    number_count = df['cleaned'].str.count(NUMBER_RE)
     df.loc[number_count > 3, 'sentiment_confidence'] -= 0.2
 
-    url_count = df['text'].str.count(r'http')
-    df.loc[url_count > 0, 'sentiment_confidence'] -= 0.1
+    #only presence matters for urls & punctuation so no need to count every match
+    has_url = df['text'].str.contains('http', regex=False, na=False)
+    df.loc[has_url, 'sentiment_confidence'] -= 0.1
 
-    driver_team_pattern = r'\b(hamilton|verstappen|leclerc|sainz|norris|russell|alonso|stroll|ocon|gasly|tsunoda|bottas|zhou|magnussen|hulkenberg|albon|sargeant|piastri|ricciardo|mercedes|ferrari|red bull|mclaren|aston martin|alpine|haas|williams|racing bulls|rb)\b'
-    driver_team_count = df['cleaned'].str.count(driver_team_pattern, flags=re.IGNORECASE)
+    driver_team_count = df['cleaned'].str.count(DRIVER_TEAM_RE)
     df.loc[driver_team_count > 2, 'sentiment_confidence'] -= 0.15
 
-    punctuation_count = df['text'].str.count(r'[!?]{2,}')
-    df.loc[punctuation_count > 0, 'sentiment_confidence'] -= 0.1
+    has_punctuation = df['text'].str.contains(PUNCTUATION_RE, na=False)
+    df.loc[has_punctuation, 'sentiment_confidence'] -= 0.1
 
-    emoji_count = df['text'].str.count(r':[a-z_]+:')
+    emoji_count = df['text'].str.count(EMOJI_CODE_RE)
     text_length = df['text'].str.len()
     emoji_ratio = emoji_count / text_length.replace(0, 1)
     df.loc[emoji_ratio > 0.3, 'sentiment_confidence'] -= 0.2
@@ -424,27 +567,14 @@ def process_sentiment_from_db(race_round: int, race_year: int, session: str = ""
         posts = [item for item in all_data if item.get('type') == 'post']
         comments = [item for item in all_data if item.get('type') == 'comment']
 
-    combined_texts = []
-    for post in posts:
-        text = f"{post.get('title', '')} {post.get('selftext', '')}"
-        combined_texts.append({
-            'id': post['id'],
-            'text': text,
-            'created': post['created'],
-            'type': 'post',
-            'session': post['session']
-        })
-
-    for comment in comments:
-        combined_texts.append({
-            'id': comment['id'],
-            'text': comment.get('body', ''),
-            'created': comment['created'],
-            'type': 'comment',
-            'session': comment['session']
-        })
-
-    df = pd.DataFrame(combined_texts)
+    #built column by column (one list per field) so the DataFrame takes whole columns instead of parsing a dict per row
+    df = pd.DataFrame({
+        'id': [post['id'] for post in posts] + [comment['id'] for comment in comments],
+        'text': [f"{post.get('title', '')} {post.get('selftext', '')}" for post in posts] + [comment.get('body', '') for comment in comments],
+        'created': [post['created'] for post in posts] + [comment['created'] for comment in comments],
+        'type': ['post'] * len(posts) + ['comment'] * len(comments),
+        'session': [post['session'] for post in posts] + [comment['session'] for comment in comments]
+    })
     if df.empty:
         logging.warning(f"No data found for round {race_round}, year {race_year}, session {session}")
         return df
@@ -453,8 +583,18 @@ def process_sentiment_from_db(race_round: int, race_year: int, session: str = ""
         logging.error("DataFrame missing 'text' column")
         return df
 
-    df['cleaned'] = df['text'].map(clean_text)
-    df['tokens'] = df['cleaned'].map(tokenize_remove_stops)
+    #cleaning is pure python regex work too, so big rounds get it spread over the same workers as VADER & TextBlob
+    if SENTIMENT_JOBS > 1 and len(df) >= PARALLEL_MIN_TEXTS:
+        logging.info(f"Cleaning {len(df)} items in {SENTIMENT_JOBS} processes")
+        #any stopwords download happens here, once, instead of in several workers racing into the same nltk_data dir
+        get_stopwords()
+        cleaned_tokens = map_chunks(clean_and_tokenize_chunk, df['text'].tolist())
+        df['cleaned'] = [cleaned for cleaned, _ in cleaned_tokens]
+        df['tokens'] = [tokens for _, tokens in cleaned_tokens]
+    else:
+        df['cleaned'] = df['text'].map(clean_text)
+        logging.debug("clean_text cache: %s", clean_str.cache_info())
+        df['tokens'] = df['cleaned'].map(tokenize_remove_stops)
 
     df = validate_sentiment_scores(df)
     low_confidence_count = len(df[df['sentiment_confidence'] < -0.3])
@@ -464,16 +604,12 @@ def process_sentiment_from_db(race_round: int, race_year: int, session: str = ""
     analyzer = MultiModelSentimentAnalyzer()
     logging.info("starting multi-model sentiment analysis..")
 
-    sentiment_results = []
-    for idx, row in df.iterrows():
-        if idx % 100 == 0:
-            logging.info(f"Processing item {idx + 1}/{len(df)}")
-        
-        result = analyzer.ensemble_analysis(row['cleaned'])
-        sentiment_results.append(result)
+    #works off the plain column list, iterrows would build a Series for every row just to read one field
+    sentiment_results = analyzer.ensemble_analysis_batch(df['cleaned'].tolist())
 
-    sentiment_df = pd.DataFrame(sentiment_results)
-    df = pd.concat([df, sentiment_df], axis=1)
+    #result columns go straight onto df, concat'ing a second frame would copy every existing column too
+    for column in SENTIMENT_RESULT_COLUMNS:
+        df[column] = [result[column] for result in sentiment_results]
     df['adjusted_ensemble_score'] = df['ensemble_score'] * (1 + df['sentiment_confidence'])
     db.save_sentiment_scores(df)
     
@@ -481,23 +617,25 @@ def process_sentiment_from_db(race_round: int, race_year: int, session: str = ""
 
 def process_in_batches(df, batch_size=1000):
     """processes large datasets in batches"""
-    results = []
+    #batch results go into plain lists & onto one copy of df at the end, instead of writing
+    #columns into iloc slices of df & concat'ing every slice back together
+    df = df.reset_index(drop=True)
+    texts = df['text'].tolist()
+    cleaned, tokens, vader_scores = [], [], []
+    sia = SentimentIntensityAnalyzer()
     
-    for i in range(0, len(df), batch_size):
-        batch = df.iloc[i:i+batch_size]
-        logging.info(f"Processing batch {i//batch_size + 1}/{(len(df)-1)//batch_size + 1}")
+    for i in range(0, len(texts), batch_size):
+        logging.info(f"Processing batch {i//batch_size + 1}/{(len(texts)-1)//batch_size + 1}")
         
-        batch['cleaned'] = batch['text'].map(clean_text)
-        batch['tokens'] = batch['cleaned'].map(tokenize_remove_stops)
-        
-        sia = SentimentIntensityAnalyzer()
-        batch['vader_score'] = batch['cleaned'].map(
-            lambda txt: sia.polarity_scores(txt)['compound']
-        )
-        
-        results.append(batch)
+        batch_cleaned = [clean_text(text) for text in texts[i:i+batch_size]]
+        cleaned.extend(batch_cleaned)
+        tokens.extend(tokenize_remove_stops(text) for text in batch_cleaned)
+        vader_scores.extend(sia.polarity_scores(text)['compound'] for text in batch_cleaned)
     
-    return pd.concat(results, ignore_index=True)
+    df['cleaned'] = cleaned
+    df['tokens'] = tokens
+    df['vader_score'] = vader_scores
+    return df
 
 def main():
     parser = argparse.ArgumentParser(description="Process sentiment analysis for F1 Reddit data")
@@ -522,7 +660,7 @@ def main():
             race_info = db.get_race_info_by_round(args.round, args.year)
             if race_info:
                 output_file = f"{race_info['race_name']}_sentiment_analysis.csv"
-                df.to_csv(output_file, index=False)
+                df.to_csv(output_file, index=False, chunksize=10_000)
                 logging.info(f"Results saved to {output_file}")
         
     except Exception as e:
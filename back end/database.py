@@ -1,10 +1,95 @@
+import io
+import csv
+import gzip
 import sqlite3
 import logging
-import pandas as pd
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional
 import os
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+POST_EXPORT_FIELDS = [
+    "id", "session", "title", "selftext", "score", "created", "permalink", "author",
+    "num_comments", "race_name", "race_round", "race_year"
+]
+COMMENT_EXPORT_FIELDS = [
+    "id", "post_id", "link_id", "parent_id", "body", "score", "created", "author",
+    "session", "race_name", "race_round", "race_year"
+]
+EXPORT_BATCH_SIZE = 5000
+
+POST_EXPORT_QUERY = f'''
+    SELECT {", ".join(POST_EXPORT_FIELDS)}
+    FROM posts
+    WHERE session = ? AND race_round = ? AND race_year = ?
+    ORDER BY created DESC
+'''
+COMMENT_EXPORT_QUERY = f'''
+    SELECT {", ".join("c." + field for field in COMMENT_EXPORT_FIELDS)}
+    FROM comments c
+    JOIN posts p ON c.post_id = p.id
+    WHERE p.session = ? AND p.race_round = ? AND p.race_year = ?
+    ORDER BY p.created DESC, c.post_id, c.created ASC
+'''
+
+CSV_COMPRESS_LEVEL = 1
+CSV_BUFFER_SIZE = 1 << 20
+
+@contextmanager
+def open_csv(filename: str):
+    """
+    Opens a csv file for writing, gzip compressed if the name ends in .gz.
+    Level 1 keeps the write about as cheap as plain text while still
+    shrinking the file several times over. Both paths sit on a 1 MiB buffer
+    so rows reach the kernel in large write() calls instead of every 8 KiB
+    """
+    if filename.endswith('.gz'):
+        # gzip.open would put the compressor on an 8 KiB buffered file, so give it our own
+        with open(filename, 'wb', buffering=CSV_BUFFER_SIZE) as raw, \
+                gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=CSV_COMPRESS_LEVEL) as gz, \
+                io.TextIOWrapper(gz, encoding='utf-8', newline='') as f:
+            yield f
+    else:
+        with open(filename, 'w', encoding='utf-8', newline='', buffering=CSV_BUFFER_SIZE) as f:
+            yield f
+
+def split_csv_name(filename: str) -> tuple:
+    """Splits a file name into stem & extension, keeping .csv.gz together"""
+    stem, ext = os.path.splitext(filename)
+    if ext == '.gz':
+        stem, inner_ext = os.path.splitext(stem)
+        ext = inner_ext + ext
+    return stem, ext or '.csv'
+
+@dataclass(slots=True)
+class PostRow:
+    """One scraped post, fields in posts table column order"""
+    id: str
+    session: str
+    title: str
+    selftext: str
+    score: int
+    created: str
+    permalink: str
+    author: Optional[str]
+    num_comments: int
+
+@dataclass(slots=True)
+class CommentRow:
+    """One scraped comment, fields in comments table column order (post_id is passed separately)"""
+    id: str
+    link_id: str
+    parent_id: str
+    body: str
+    score: int
+    created: str
+    author: Optional[str]
+    session: str
+
 class F1Database:
     def __init__(self, db_path: Optional[str] = None):
         """Initialized F1 sentiment database"""
@@ -103,11 +188,11 @@ class F1Database:
             logging.error(f"Error initializing database: {e}")
             raise
 
-    def insert_post(self, post_data: Dict, race_info: Dict) -> bool:
+    def insert_post(self, post_data: PostRow, race_info: Dict) -> bool:
         """
         Inserts a post into the db
         Parameters:
-            post_data: Dictionary containing post information
+            post_data: PostRow containing post information
             race_info: Dictionary containing race information
         """
         try:
@@ -121,15 +206,15 @@ class F1Database:
                      num_comments, race_name, race_round, race_year)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    post_data['id'],
-                    post_data['session'],
-                    post_data['title'],
-                    post_data['selftext'],
-                    post_data['score'],
-                    post_data['created'],
-                    post_data['permalink'],
-                    post_data['author'],
-                    post_data['num_comments'],
+                    post_data.id,
+                    post_data.session,
+                    post_data.title,
+                    post_data.selftext,
+                    post_data.score,
+                    post_data.created,
+                    post_data.permalink,
+                    post_data.author,
+                    post_data.num_comments,
                     race_info['raceName'],
                     race_info['round'],
                     race_info['season']
@@ -139,14 +224,14 @@ class F1Database:
                 return True
 
         except Exception as e:
-            logging.error(f"Error inserting post {post_data.get('id', 'unknown')}: {e}")
+            logging.error(f"Error inserting post {post_data.id}: {e}")
             return False
     
-    def insert_comment(self, comment_data: Dict, post_id: str, race_info: Dict) -> bool:
+    def insert_comment(self, comment_data: CommentRow, post_id: str, race_info: Dict) -> bool:
         """
         Inserts comment into db
         Parameters:
-            comment_data: dict containing comment info (duh)
+            comment_data: CommentRow containing comment info (duh)
             post_id: ID of parent post
             race_info: dict containing race info
         """
@@ -160,15 +245,15 @@ class F1Database:
                      session, race_name, race_round, race_year)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
-                    comment_data['id'],
+                    comment_data.id,
                     post_id,
-                    comment_data['link_id'],
-                    comment_data['parent_id'],
-                    comment_data['body'],
-                    comment_data['score'],
-                    comment_data['created'],
-                    comment_data['author'],
-                    comment_data['session'],
+                    comment_data.link_id,
+                    comment_data.parent_id,
+                    comment_data.body,
+                    comment_data.score,
+                    comment_data.created,
+                    comment_data.author,
+                    comment_data.session,
                     race_info['raceName'],
                     race_info['round'],
                     race_info['season']
@@ -178,9 +263,72 @@ class F1Database:
                 return True
         
         except Exception as e:
-            logging.error(f"Error inserting comment {comment_data.get('id', 'unknown')} : {e}")
+            logging.error(f"Error inserting comment {comment_data.id} : {e}")
             return False
     
+    def insert_posts_bulk(self, posts: List[PostRow], race_info: Dict) -> int:
+        """
+        Inserts many posts into the db in one transaction
+        Parameters:
+            posts: PostRows to insert
+            race_info: Dictionary containing race information
+        Returns number of rows submitted (INSERT OR IGNORE duplicates included).
+        If the batch fails it falls back to per-row inserts so one bad row only loses that row
+        """
+        if not posts:
+            return 0
+        race = (race_info['raceName'], race_info['round'], race_info['season'])
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    '''
+                    INSERT OR IGNORE INTO posts 
+                    (id, session, title, selftext, score, created, permalink, author, 
+                     num_comments, race_name, race_round, race_year)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (post.id, post.session, post.title, post.selftext, post.score, post.created,
+                     post.permalink, post.author, post.num_comments, *race)
+                    for post in posts
+                ])
+                return len(posts)
+
+        except Exception as e:
+            logging.error(f"Database error bulk inserting {len(posts)} posts, retrying row by row: {e}")
+            return sum(self.insert_post(post, race_info) for post in posts)
+
+    def insert_comments_bulk(self, comments: List[tuple], race_info: Dict) -> int:
+        """
+        Inserts many comments into the db in one transaction
+        Parameters:
+            comments: <post_id, CommentRow> pairs to insert
+            race_info: dict containing race info
+        Returns number of rows submitted (INSERT OR IGNORE duplicates included).
+        If the batch fails it falls back to per-row inserts so one bad row only loses that row
+        """
+        if not comments:
+            return 0
+        race = (race_info['raceName'], race_info['round'], race_info['season'])
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO comments 
+                    (id, post_id, link_id, parent_id, body, score, created, author, 
+                     session, race_name, race_round, race_year)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (comment.id, post_id, comment.link_id, comment.parent_id, comment.body, comment.score,
+                     comment.created, comment.author, comment.session, *race)
+                    for post_id, comment in comments
+                ])
+                return len(comments)
+
+        except Exception as e:
+            logging.error(f"Database error bulk inserting {len(comments)} comments, retrying row by row: {e}")
+            return sum(self.insert_comment(comment, post_id, race_info) for post_id, comment in comments)
+    
     def insert_race(self, race_info: Dict):
         """
         Inserts race info into db
@@ -250,35 +398,56 @@ class F1Database:
             logging.error(f"Error fetching comments: {e}")
             return []
     
-    def export_to_csv(self, session: str, race_round: int, race_year: int, filename: str):
+    def _write_query_csv(self, conn: sqlite3.Connection, query: str, params: tuple, fields: List[str], filename: str) -> int:
+        """Streams the rows of a query into a csv file, returns number of rows written"""
+        cursor = conn.execute(query, params)
+        record_count = 0
+
+        # rows stay plain tuples from sqlite straight into csv.writer, no per row dicts
+        with open_csv(filename) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(fields)
+
+            batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            while batch:
+                writer.writerows(batch)
+                record_count += len(batch)
+                batch = cursor.fetchmany(EXPORT_BATCH_SIZE)
+
+        return record_count
+
+    def export_to_csv(self, session: str, race_round: int, race_year: int, filename: str) -> List[str]:
         """
         Export posts and comments for a specific session to CSV.
+        Posts and comments have different columns so they go to separate
+        <name>_posts.csv and <name>_comments.csv files.
+        Returns the list of files written
         """
         try:
-            posts = self.get_comments_by_round(session, race_round, race_year)
-            all_records = []
-            
-            for post in posts:
-                post_record = post.copy()
-                post_record['type'] = 'post'
-                all_records.append(post_record)
-                
-                # Add comment records
-                comments = self.get_comments_by_post(post['id'])
-                for comment in comments:
-                    comment_record = comment.copy()
-                    comment_record['type'] = 'comment'
-                    all_records.append(comment_record)
-            
-            if all_records:
-                df = pd.DataFrame(all_records)
-                df.to_csv(filename, index=False)
-                logging.info(f"Exported {len(all_records)} records to {filename}")
-            else:
-                logging.warning(f"No records found for export to {filename}")
+            stem, ext = split_csv_name(filename)
+            posts_file = f"{stem}_posts{ext}"
+            comments_file = f"{stem}_comments{ext}"
+            params = (session, race_round, race_year)
+
+            with sqlite3.connect(self.db_path) as conn:
+                post_count = conn.execute(
+                    'SELECT COUNT(*) FROM posts WHERE session = ? AND race_round = ? AND race_year = ?', params
+                ).fetchone()[0]
+                if not post_count:
+                    logging.warning(f"No records found for export to {filename}")
+                    return []
+
+                post_count = self._write_query_csv(conn, POST_EXPORT_QUERY, params, POST_EXPORT_FIELDS, posts_file)
+                logging.info(f"Exported {post_count} records to {posts_file}")
+
+                comment_count = self._write_query_csv(conn, COMMENT_EXPORT_QUERY, params, COMMENT_EXPORT_FIELDS, comments_file)
+                logging.info(f"Exported {comment_count} records to {comments_file}")
+
+            return [posts_file, comments_file]
                 
         except Exception as e:
             logging.error(f"Error exporting to CSV: {e}")
+            return []
 
     def get_comments_by_round(self, session: str, race_round: int, race_year: int) -> List[Dict]:
         """
@@ -384,8 +553,11 @@ class F1Database:
 
                 for table_name in tables:
                     table_name = table_name[0]
-                    df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-                    df.to_csv(f"{table_name}.csv", index=False)
+                    cursor = conn.execute(f"SELECT * FROM {table_name}")
+                    with open_csv(f"{table_name}.csv") as f:
+                        writer = csv.writer(f, lineterminator='\n')
+                        writer.writerow([description[0] for description in cursor.description])
+                        writer.writerows(cursor)
                     print(f"Exported {table_name} to {table_name}.csv")
                 
         except Exception as e:
@@ -445,7 +617,7 @@ class F1Database:
             logging.error(f"Error creating sentiment table: {e}")
             raise
 
-    def save_sentiment_scores(self, sentiment_data: pd.DataFrame):
+    def save_sentiment_scores(self, sentiment_data: "pd.DataFrame"):
         """Save sentiment scores to database"""
         try:
             with sqlite3.connect(self.db_path) as conn:
@@ -0,0 +1,30 @@
+import os
+import requests
+from datetime import timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_cache import CachedSession
+
+#shared by the scraper & the batch runner so both read & write the cache w/ the same settings
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".f1sentiment")
+ERGAST_CACHE_TTL = timedelta(days=30) #a given year/round's race data doesn't change once it's published
+ERGAST_LATEST_TTL = timedelta(minutes=10) #year/last moves on every race weekend so keep it short
+ERGAST_SEASON_TTL = timedelta(hours=24) #season calendar, refreshed daily in case a round moves or is cancelled
+HTTP_TIMEOUT = (3.05, 10) #<connect, read>, fail fast on a dead host but give slow responses time
+ERGAST_HEADERS = {"User-Agent": "F1-Sentiment-Analysis/1.0", "Accept": "application/json"}
+
+def CreateHttpSession() -> requests.Session:
+    """Creates a pooled, disk cached http session w/ retries for the Ergast API"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    session = CachedSession(
+        os.path.join(CACHE_DIR, "ergast_cache"),
+        backend="sqlite",
+        expire_after=ERGAST_CACHE_TTL,
+        allowable_codes=(200,)
+    )
+    retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+    session.headers.update(ERGAST_HEADERS)
+    return session
+
+HTTP_SESSION = CreateHttpSession()